@@ -5,7 +5,7 @@ What it does (high level):
 - Polls known VC portfolio pages for new projects (Binance Labs, Coinbase Ventures, a16z Crypto, Wintermute, + extensible list)
 - (Optional) pulls public feeds for listings/unlocks (DropsTab/CoinGecko/CMC — via simple HTTP; keep disabled if you don’t have keys)
 - Scores each project (e.g., VC backing + catalyst) and sends a Telegram alert only when threshold is met
-- De-dupes and persists state in a lightweight local JSON file
+- De-dupes and persists state in a local SQLite file (WAL mode)
 
 IMPORTANT
 - These portfolio pages change HTML often. The scrapers below are written to be resilient and easy to tweak.
@@ -32,7 +32,8 @@ COINGECKO_NEW_COIN_CHECK=true             # uses public endpoint, rate-limited
 
 Tuning
 ------
-- Edit VC_SOURCES to add/remove VCs. Each entry can use one of the provided parser styles or a custom function.
+- Edit VC_SOURCES to add/remove VCs. Each entry names a parser registered in PARSERS ("generic" by default);
+  register a custom function there for site-specific scraping.
 - Adjust SCORE_WEIGHTS / SCORE_THRESHOLD to control what triggers an alert.
 
 """
@@ -40,14 +41,27 @@ from __future__ import annotations
 import os
 import re
 import time
+import atexit
 import json
+import math
 import html
+import codecs
+import hashlib
 import logging
+import sqlite3
+import threading
+import importlib.util
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional, Set, Tuple
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
 
+import asyncio
+import aiohttp
+import orjson
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from selectolax.lexbor import LexborHTMLParser
 from urllib.parse import urljoin, urlparse
 from dotenv import load_dotenv
 
@@ -64,10 +78,19 @@ POLL_INTERVAL = int(os.getenv("POLL_INTERVAL_SECONDS", "900"))
 
 DROPS_API_KEY = os.getenv("DROPS_API_KEY", "")
 COINGECKO_NEW_COIN_CHECK = os.getenv("COINGECKO_NEW_COIN_CHECK", "true").lower() == "true"
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "vc_http_cache.json")  # ETags + parsed items per page
+CG_BLOOM_PATH = os.getenv("CG_BLOOM_PATH", "coingecko_bloom.bin")  # cached name filter + ETag
+CG_REFRESH_SECONDS = int(os.getenv("CG_REFRESH_SECONDS", "3600"))  # CoinGecko list cadence (daemon mode)
 
-STATE_PATH = os.getenv("STATE_PATH", "vc_signal_state.json")
+STATE_DB_PATH = os.getenv("STATE_DB_PATH", "vc_signal_state.db")
+STATE_PATH = os.getenv("STATE_PATH", "vc_signal_state.json")  # legacy JSON state, imported once
+SEEN_MAX_ITEMS = int(os.getenv("SEEN_MAX_ITEMS", "50000"))  # names remembered per seen_items bucket
 USER_AGENT = "VC-Signal-Bot/1.0 (+https://example.com)"
 REQUIRE_MULTI_VC = os.getenv("REQUIRE_MULTI_VC", "true").lower() == "true"
+FETCH_TIMEOUT = int(os.getenv("FETCH_TIMEOUT_SECONDS", "45"))  # per source, retries included
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))  # sources fetched at once
+FETCH_CHUNK_SIZE = max(1, int(os.getenv("FETCH_CHUNK_SIZE", "8")))  # fetch tasks scheduled at once (sliding window)
+HOST_MIN_GAP = float(os.getenv("HOST_MIN_GAP_SECONDS", "1.0"))  # min spacing between hits on one host
 
 # --- Recap / digest settings ---
 DIGEST_INTERVAL_HOURS = int(os.getenv("DIGEST_INTERVAL_HOURS", "4"))  # one email every 4h
@@ -89,42 +112,211 @@ HEADERS = {
     "Pragma": "no-cache",
 }
 
+HAS_CLOUDSCRAPER = importlib.util.find_spec("cloudscraper") is not None
+
+
+def _build_session() -> requests.Session:
+    """Pooled keep-alive session for the API calls (CoinGecko, Telegram)."""
+    sess = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=1.5, status_forcelist=[403, 429, 502, 503, 504]),
+    )
+    sess.mount("https://", adapter)
+    sess.mount("http://", adapter)
+    return sess
+
+
+SESSION = _build_session()
+_scraper_local = threading.local()  # cloudscraper mutates itself while solving challenges: one per thread
+
+
+def _get_scraper():
+    """This worker thread's cloudscraper instance (only used for blocked portfolio pages)."""
+    scraper = getattr(_scraper_local, "scraper", None)
+    if scraper is None:
+        import cloudscraper
+        scraper = cloudscraper.create_scraper(browser={"custom": "chrome"})
+        _scraper_local.scraper = scraper
+    return scraper
+
 
 # -------------------------
 # Helpers & persistence
 # -------------------------
 
-def load_state() -> dict:
-    if not os.path.exists(STATE_PATH):
-        return {"seen_items": {}, "overlaps": {}, "pending_signals": []}
+def _migrate_seen_bucket(bucket) -> Dict[str, int]:
+    """Old states stored "name:score" strings; keep the best score per name."""
+    if isinstance(bucket, dict):
+        return bucket
+    out: Dict[str, int] = {}
+    for item in bucket or []:
+        name, _, score = str(item).rpartition(":")
+        try:
+            out[name] = max(out.get(name, 0), int(score))
+        except ValueError:
+            continue
+    return out
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    source  TEXT NOT NULL,
+    name_lc TEXT NOT NULL,
+    score   INTEGER NOT NULL,
+    PRIMARY KEY (source, name_lc)
+);
+CREATE TABLE IF NOT EXISTS pending (
+    name_lc TEXT PRIMARY KEY,
+    name    TEXT NOT NULL,
+    url     TEXT,
+    tags    TEXT NOT NULL,      -- JSON array, kept sorted
+    score   INTEGER NOT NULL,
+    ts      TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS overlaps (
+    key        TEXT PRIMARY KEY,
+    name       TEXT NOT NULL,
+    url        TEXT,
+    vcs        TEXT NOT NULL,   -- JSON array
+    score      INTEGER NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    k TEXT PRIMARY KEY,
+    v TEXT
+);
+"""
+
+
+def open_state() -> sqlite3.Connection:
+    """Open (and create/migrate) the SQLite state DB. One transaction per poll; caller commits."""
+    db = sqlite3.connect(STATE_DB_PATH)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(_SCHEMA)
+    _import_legacy_json(db)
+    return db
+
+
+def get_meta(db: sqlite3.Connection, k: str) -> Optional[str]:
+    row = db.execute("SELECT v FROM meta WHERE k = ?", (k,)).fetchone()
+    return row["v"] if row else None
+
+
+def set_meta(db: sqlite3.Connection, k: str, v: str) -> None:
+    db.execute("INSERT INTO meta (k, v) VALUES (?, ?) ON CONFLICT(k) DO UPDATE SET v = excluded.v", (k, v))
+
+
+def seen_score(db: sqlite3.Connection, source: str, name_lc: str) -> int:
+    row = db.execute("SELECT score FROM seen WHERE source = ? AND name_lc = ?", (source, name_lc)).fetchone()
+    return row["score"] if row else 0
+
+
+def mark_seen(db: sqlite3.Connection, source: str, name_lc: str, score: int) -> None:
+    """Record the last alerted score (REPLACE gives a fresh rowid, so rowid order tracks recency)."""
+    db.execute("INSERT OR REPLACE INTO seen (source, name_lc, score) VALUES (?, ?, ?)", (source, name_lc, score))
+
+
+def prune_seen(db: sqlite3.Connection, source: str) -> None:
+    """Forget the oldest names past SEEN_MAX_ITEMS."""
+    db.execute(
+        "DELETE FROM seen WHERE source = ? AND rowid NOT IN "
+        "(SELECT rowid FROM seen WHERE source = ? ORDER BY rowid DESC LIMIT ?)",
+        (source, source, SEEN_MAX_ITEMS),
+    )
+
+
+def load_overlaps(db: sqlite3.Connection) -> Dict[str, dict]:
+    out: Dict[str, dict] = {}
+    for row in db.execute("SELECT * FROM overlaps"):
+        ov = dict(row)
+        ov["vcs"] = orjson.loads(ov["vcs"])
+        out[ov.pop("key")] = ov
+    return out
+
+
+def save_overlap(db: sqlite3.Connection, key: str, ov: dict) -> None:
+    db.execute(
+        "INSERT OR REPLACE INTO overlaps (key, name, url, vcs, score, first_seen, last_seen) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (key, ov.get("name", key), ov.get("url"), orjson.dumps(sorted(ov.get("vcs", []))).decode(),
+         int(ov.get("score", 0)), ov.get("first_seen", ""), ov.get("last_seen") or ov.get("first_seen", "")),
+    )
+
+
+def _import_legacy_json(db: sqlite3.Connection) -> None:
+    """One-time import of the pre-SQLite JSON state file (STATE_PATH), if there is one."""
+    if get_meta(db, "legacy_imported") or not os.path.exists(STATE_PATH):
+        return
     try:
-        with open(STATE_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            data.setdefault("seen_items", {})
-            data.setdefault("pending_signals", [])
-            data.setdefault("overlaps", {})  # NEW
-            return data
+        with open(STATE_PATH, "rb") as f:
+            data = orjson.loads(f.read())
+    except Exception:
+        logging.exception("Failed to read legacy state %s; starting fresh.", STATE_PATH)
+        return
+    for source, bucket in data.get("seen_items", {}).items():
+        db.executemany(
+            "INSERT OR IGNORE INTO seen (source, name_lc, score) VALUES (?, ?, ?)",
+            [(source, k, v) for k, v in _migrate_seen_bucket(bucket).items()],
+        )
+    for sig in data.get("pending_signals", []):
+        queue_signal(db, sig)
+    for key, ov in data.get("overlaps", {}).items():
+        save_overlap(db, key, ov)
+    if data.get("last_digest_sent"):
+        set_meta(db, "last_digest_sent", data["last_digest_sent"])
+    set_meta(db, "legacy_imported", STATE_PATH)
+    db.commit()
+    logging.info("Imported legacy JSON state from %s.", STATE_PATH)
+
+
+def load_http_cache() -> dict:
+    """{url: {etag, last_modified, body_hash, items}} from the last successful fetch of each page."""
+    if not os.path.exists(HTTP_CACHE_PATH):
+        return {}
+    try:
+        with open(HTTP_CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        logging.exception("Failed to load HTTP cache; starting cold.")
+        return {}
+
+
+def save_http_cache(cache: dict) -> None:
+    try:
+        tmp = HTTP_CACHE_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp, HTTP_CACHE_PATH)
     except Exception:
-        logging.exception("Failed to load state; creating new.")
-        return {"seen_items": {}, "pending_signals": [], "overlaps": {}}
+        logging.exception("Failed to write %s", HTTP_CACHE_PATH)
 
 
-def save_state(state: dict) -> None:
-    tmp = STATE_PATH + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2, ensure_ascii=False)
-    os.replace(tmp, STATE_PATH)
+# Compiled once: these run per anchor on every page.
+_NAME_SUFFIX = re.compile(r"\b(labs|protocol|network|foundation|inc\.?|ltd\.?|co\.?|dao|finance|capital|protocols)\b")
+_PUNCT = re.compile(r"[^\w\s]")
+_PROJECT_PATH = re.compile(r"/(portfolio|companies|projects|investment|company)/", re.I)
+_VC_DOMAIN = re.compile(
+    r"(a16z|binance|paradigm|pantera|polychain|dragonfly|jumpcrypto|wintermute|animoca|okx|hashed|electriccapital|framework)",
+    re.I,
+)
+# Very common link texts that are never project names
+_STOPWORDS = frozenset({"learn more", "portfolio", "read more", "apply", "about", "careers", "contact", "news"})
 
 
 def normalize_project_name(name: str) -> str:
-    name = re.sub(r"\s+", " ", name).strip().lower()
+    name = " ".join(name.split()).lower()   # collapse whitespace (C-level, no regex)
     # drop common suffixes
-    name = re.sub(r"\b(labs|protocol|network|foundation|inc\.?|ltd\.?|co\.?|dao|finance|capital|protocols)\b", "", name)
-    name = re.sub(r"[^\w\s]", "", name)          # remove punctuation
-    name = re.sub(r"\s+", " ", name).strip()
-    return name
+    name = _NAME_SUFFIX.sub("", name)
+    name = _PUNCT.sub("", name)          # remove punctuation
+    return " ".join(name.split())
 
 
+@lru_cache(maxsize=4096)
 def domain_of(url: str) -> str:
     try:
         return urlparse(url).netloc
@@ -176,6 +368,53 @@ def send_sms(message: str) -> bool:
         return False
 
 
+_SMTP: Optional[smtplib.SMTP] = None  # lazily opened, reused across sends
+
+
+def _close_smtp() -> None:
+    global _SMTP
+    if _SMTP is not None:
+        try:
+            _SMTP.quit()
+        except Exception:
+            pass
+        _SMTP = None
+
+
+def _get_smtp() -> smtplib.SMTP:
+    """Return a live, logged-in SMTP connection, reconnecting if the server dropped it."""
+    global _SMTP
+    if _SMTP is not None:
+        try:
+            if _SMTP.noop()[0] == 250:
+                return _SMTP
+        except (smtplib.SMTPException, OSError):
+            pass
+        _close_smtp()
+    server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=20)
+    try:
+        server.starttls()
+        if SMTP_USER and SMTP_PASS:
+            server.login(SMTP_USER, SMTP_PASS)
+    except Exception:
+        server.close()  # don't leak the socket on a failed handshake/login
+        raise
+    _SMTP = server
+    return server
+
+
+def _smtp_send(msg) -> None:
+    try:
+        _get_smtp().sendmail(SMTP_FROM, [EMAIL_TO], msg.as_string())
+    except smtplib.SMTPServerDisconnected:
+        # dropped between the liveness check and the send: one fresh attempt
+        _close_smtp()
+        _get_smtp().sendmail(SMTP_FROM, [EMAIL_TO], msg.as_string())
+
+
+atexit.register(_close_smtp)
+
+
 def send_email(subject: str, message: str) -> bool:
     if not (SMTP_HOST and SMTP_FROM and EMAIL_TO):
         return False
@@ -184,11 +423,7 @@ def send_email(subject: str, message: str) -> bool:
         msg["Subject"] = subject
         msg["From"] = SMTP_FROM
         msg["To"] = EMAIL_TO
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=20) as server:
-            server.starttls()
-            if SMTP_USER and SMTP_PASS:
-                server.login(SMTP_USER, SMTP_PASS)
-            server.sendmail(SMTP_FROM, [EMAIL_TO], msg.as_string())
+        _smtp_send(msg)
         return True
     except Exception:
         logging.exception("Email send failed")
@@ -206,7 +441,7 @@ def tg_send(message: str, preview: bool = True) -> bool:
         "disable_web_page_preview": not preview,
     }
     try:
-        r = requests.post(url, json=payload, timeout=20)
+        r = SESSION.post(url, json=payload, timeout=20)
         r.raise_for_status()
         return True
     except Exception:
@@ -238,17 +473,20 @@ class Source:
     key: str
     name: str
     url: str
-    parser: Callable[[str, str], List[Tuple[str, str]]]
+    parser: str = "generic"  # key into PARSERS
 
 
-def generic_portfolio_parser(base_url: str, html_text: str) -> List[Tuple[str, str]]:
-    soup = BeautifulSoup(html_text, "html.parser")
+def generic_portfolio_parser(base_url: str, page: Union[str, bytes]) -> List[Tuple[str, str]]:
+    tree = LexborHTMLParser(page)  # lexbor reads bytes as UTF-8; see html_for_parser
     items: List[Tuple[str, str]] = []
+    base_domain = domain_of(base_url)
+    base_parts = urlparse(base_url)
+    base_origin = f"{base_parts.scheme}://{base_parts.netloc}"
 
     # Heuristics: look for anchors inside cards/grids
-    for a in soup.select("a"):
-        href = a.get("href")
-        text = a.get_text(strip=True)
+    for a in tree.css("a[href]"):
+        href = a.attributes.get("href")
+        text = a.text(strip=True)
         if not href or not text:
             continue
         # Skip internal anchors
@@ -258,13 +496,23 @@ def generic_portfolio_parser(base_url: str, html_text: str) -> List[Tuple[str, s
         if len(text) > 60 or len(text) < 2:
             continue
         # Very common words to ignore
-        if text.lower() in {"learn more", "portfolio", "read more", "apply", "about", "careers", "contact", "news"}:
+        if text.lower() in _STOPWORDS:
             continue
-        full = urljoin(base_url, href)
+        # Absolute and plain root-relative hrefs cover most links; let urljoin handle the rest
+        # (including dot segments like "/a/../b", which it normalises)
+        if href.startswith(("http://", "https://")):
+            full = href
+            same_site = domain_of(full) == base_domain
+        elif href.startswith("/") and not href.startswith("//") and "/." not in href:
+            full = base_origin + href
+            same_site = True
+        else:
+            full = urljoin(base_url, href)
+            same_site = domain_of(full) == base_domain
         # Avoid own-domain navigational links
-        if domain_of(full) == domain_of(base_url):
+        if same_site:
             # Keep only if looks like a project subpage
-            if not re.search(r"/portfolio/|/companies/|/projects/|/investment/|/company/", full, flags=re.I):
+            if not _PROJECT_PATH.search(full):
                 continue
         items.append((normalize_project_name(text), full))
 
@@ -280,8 +528,98 @@ def generic_portfolio_parser(base_url: str, html_text: str) -> List[Tuple[str, s
     return out
 
 
-def fetch_source_list(source: Source) -> List[Tuple[str, str]]:
-    import importlib, random, time as _t
+# Parser registry: Source.parser -> fn(base_url, page) -> [(name, url)]; page is UTF-8 bytes,
+# or str when the page declared another charset (see html_for_parser)
+PARSERS: Dict[str, Callable[[str, Union[str, bytes]], List[Tuple[str, str]]]] = {
+    "generic": generic_portfolio_parser,
+}
+
+
+# host -> earliest monotonic time the next request may start
+_host_next_slot: Dict[str, float] = {}
+
+
+async def wait_for_host_slot(url: str) -> None:
+    """Space requests to the same host at least HOST_MIN_GAP apart (retries included)."""
+    host = domain_of(url)
+    now = time.monotonic()
+    slot = max(now, _host_next_slot.get(host, 0.0))
+    _host_next_slot[host] = slot + HOST_MIN_GAP  # reserve before sleeping so concurrent callers queue up
+    if slot > now:
+        await asyncio.sleep(slot - now)
+
+
+_CONTENT_TYPE_CHARSET = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+# <meta charset=...> and <meta http-equiv="Content-Type" content="...; charset=...">
+_META_CHARSET = re.compile(rb"<meta[^>]*?charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+
+
+def _cloudscraper_get(url: str, hdr: Dict[str, str]) -> Tuple[bytes, Optional[str]]:
+    """Blocking fallback for Cloudflare-challenged pages (runs in a worker thread)."""
+    r = _get_scraper().get(url, headers=hdr, timeout=30)
+    r.raise_for_status()
+    m = _CONTENT_TYPE_CHARSET.search(r.headers.get("Content-Type", ""))
+    return r.content, m.group(1) if m else None
+
+
+def html_for_parser(body: bytes, charset: Optional[str]) -> Union[str, bytes]:
+    """Decode pages declaring a non-UTF-8 charset; lexbor reads raw bytes as UTF-8.
+
+    The HTTP header wins; without one, the <meta> charset in the first 2 KB is used.
+    UTF-8 (or undeclared) pages are passed through as bytes with no decode.
+    """
+    if not charset:
+        m = _META_CHARSET.search(body, 0, 2048)
+        charset = m.group(1).decode("ascii", "ignore") if m else None
+    if not charset:
+        return body
+    try:
+        codec = codecs.lookup(charset).name
+    except LookupError:
+        return body
+    if codec == "utf-8":
+        return body
+    return body.decode(codec, errors="replace")
+
+
+# Bump when parser logic changes so cached parses of unchanged pages are redone
+PARSER_CACHE_VERSION = 1
+
+
+def _parser_tag(source: Source) -> str:
+    return f"{source.parser}:{PARSER_CACHE_VERSION}"
+
+
+def cached_entry(source: Source, http_cache: dict) -> dict:
+    """The cache entry for source.url, or {} if missing or produced by another parser/version."""
+    entry = http_cache.get(source.url) or {}
+    if "items" not in entry or entry.get("parser") != _parser_tag(source):
+        return {}
+    return entry
+
+
+def parse_with_cache(source: Source, body: bytes, http_cache: dict, charset: Optional[str] = None,
+                     etag: Optional[str] = None, last_modified: Optional[str] = None) -> List[Tuple[str, str]]:
+    """Run the source's parser unless the body is byte-identical to the cached one."""
+    body_hash = hashlib.sha1(body).hexdigest()
+    entry = cached_entry(source, http_cache)
+    if entry.get("body_hash") == body_hash:
+        items = [tuple(it) for it in entry["items"]]
+    else:
+        items = PARSERS[source.parser](source.url, html_for_parser(body, charset))
+    http_cache[source.url] = {
+        "parser": _parser_tag(source),
+        "etag": etag,
+        "last_modified": last_modified,
+        "body_hash": body_hash,
+        "items": items,
+    }
+    return items
+
+
+async def fetch_source_list(session: aiohttp.ClientSession, source: Source,
+                            http_cache: dict) -> List[Tuple[str, str]]:
+    import random
 
     try:
         # rotate a couple of UAs lightly
@@ -293,22 +631,35 @@ def fetch_source_list(source: Source) -> List[Tuple[str, str]]:
         hdr = dict(HEADERS)
         hdr["User-Agent"] = random.choice(uas)
 
-        # requests session (cloudscraper if installed)
-        sess = None
-        if importlib.util.find_spec("cloudscraper"):
-            import cloudscraper
-            sess = cloudscraper.create_scraper(browser={"custom": "chrome"})
-        else:
-            sess = requests
+        # conditional GET: only worth it if we still have current parsed items.
+        # Kept out of hdr: the cloudscraper fallback must do a plain GET, since
+        # requests doesn't raise on a 304 and would hand us an empty body.
+        cached = cached_entry(source, http_cache)
+        cond_hdr = dict(hdr)
+        if cached.get("etag"):
+            cond_hdr["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            cond_hdr["If-Modified-Since"] = cached["last_modified"]
 
         # simple retry/backoff
         for i in range(3):
-            r = sess.get(source.url, headers=hdr, timeout=30)
-            if r.status_code in (403, 429) and i < 2:
-                _t.sleep(1.5 * (i + 1))
-                continue
-            r.raise_for_status()
-            return source.parser(source.url, r.text)
+            etag = last_modified = charset = None
+            await wait_for_host_slot(source.url)
+            async with session.get(source.url, headers=cond_hdr, timeout=aiohttp.ClientTimeout(total=30)) as r:
+                if r.status == 304 and cached:
+                    return [tuple(it) for it in cached["items"]]
+                if r.status in (403, 429) and i < 2:
+                    await asyncio.sleep(1.5 * (i + 1))
+                    continue
+                if r.status == 403 and HAS_CLOUDSCRAPER:
+                    # still blocked: retry through cloudscraper if installed
+                    body, charset = await asyncio.to_thread(_cloudscraper_get, source.url, hdr)
+                else:
+                    r.raise_for_status()
+                    body = await r.read()  # decoded later only if the header names a non-UTF-8 charset
+                    charset = r.charset
+                    etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+            return parse_with_cache(source, body, http_cache, charset, etag, last_modified)
 
         return []
     except Exception:
@@ -322,19 +673,16 @@ VC_SOURCES: List[Source] = [
         key="binance_labs",
         name="Binance Labs Portfolio",
         url="https://labs.binance.com/portfolio",
-        parser=generic_portfolio_parser,
     ),
     Source(
         key="a16z_crypto",
         name="a16z Crypto Portfolio",
         url="https://a16z.com/portfolio/",
-        parser=generic_portfolio_parser,
     ),
     Source(
         key="wintermute",
         name="Wintermute Investments",
         url="https://www.wintermute.com/portfolio/",
-        parser=generic_portfolio_parser,
     ),
 
     # --- Disable noisy/blocked ones for now ---
@@ -342,13 +690,11 @@ VC_SOURCES: List[Source] = [
     #     key="coinbase_ventures",
     #     name="Coinbase Ventures Portfolio",
     #     url="https://www.coinbase.com/ventures/portfolio",
-    #     parser=generic_portfolio_parser,
     # ),
     # Source(
     #     key="chainbroker_recent",
     #     name="ChainBroker Recently Added",
     #     url="https://chainbroker.io/projects/recently-added/",
-    #     parser=generic_portfolio_parser,
     # ),
 
     # --- Add more VCs / funds (scrape-friendly) ---
@@ -356,88 +702,179 @@ VC_SOURCES: List[Source] = [
         key="pantera",
         name="Pantera Capital Portfolio",
         url="https://panteracapital.com/portfolio/",
-        parser=generic_portfolio_parser,
     ),
     Source(
         key="multicoin",
         name="Multicoin Capital Portfolio",
         url="https://multicoin.capital/portfolio/",
-        parser=generic_portfolio_parser,
     ),
     Source(
         key="polychain",
         name="Polychain Capital Portfolio",
         url="https://polychain.capital/portfolio/",
-        parser=generic_portfolio_parser,
     ),
     Source(
         key="paradigm",
         name="Paradigm Portfolio",
         url="https://www.paradigm.xyz/companies",
-        parser=generic_portfolio_parser,
     ),
     Source(
         key="dragonfly",
         name="Dragonfly Portfolio",
         url="https://www.dragonfly.xyz/portfolio",
-        parser=generic_portfolio_parser,
     ),
     Source(
         key="jump_crypto",
         name="Jump Crypto Portfolio",
         url="https://www.jumpcrypto.com/portfolio",
-        parser=generic_portfolio_parser,
     ),
     Source(
         key="electric_capital",
         name="Electric Capital Portfolio",
         url="https://www.electriccapital.com/portfolio",
-        parser=generic_portfolio_parser,
     ),
     Source(
         key="hashed",
         name="Hashed Portfolio",
         url="https://www.hashed.com/portfolio",
-        parser=generic_portfolio_parser,
     ),
     Source(
         key="framework",
         name="Framework Ventures Portfolio",
         url="https://framework.ventures/portfolio/",
-        parser=generic_portfolio_parser,
     ),
     Source(
         key="animoca",
         name="Animoca Brands Investments",
         url="https://www.animocabrands.com/investment-portfolio",
-        parser=generic_portfolio_parser,
     ),
     Source(
         key="okx_ventures",
         name="OKX Ventures Portfolio",
         url="https://www.okx.com/ventures/portfolio",
-        parser=generic_portfolio_parser,
     ),
 ]
 
+# Fail fast on a mistyped parser key instead of logging it as a fetch failure every poll
+_unknown_parsers = sorted({src.parser for src in VC_SOURCES} - PARSERS.keys())
+if _unknown_parsers:
+    raise ValueError(f"VC_SOURCES uses unknown parser(s) {_unknown_parsers}; known: {sorted(PARSERS)}")
+
 
 # -------------------------
 # Optional: Listings / new coins / unlocks
 # -------------------------
 
-def coingecko_new_coins() -> List[dict]:
+class BloomFilter:
+    """Compact set-membership filter for the CoinGecko name list (no false negatives)."""
+
+    def __init__(self, capacity: int, error_rate: float = 1e-4):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.num_hashes))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def save(self, path: str, meta: dict) -> None:
+        header = dict(meta, size=self.size, num_hashes=self.num_hashes, count=self.count)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(self.bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple[Optional["BloomFilter"], dict]:
+        """Returns (filter, meta) or (None, {}) if the file is missing or unreadable."""
+        if not os.path.exists(path):
+            return None, {}
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                bits = bytearray(f.read())
+            if len(bits) != (header["size"] + 7) // 8:
+                raise ValueError("truncated bloom filter")
+            bloom = cls.__new__(cls)
+            bloom.size, bloom.num_hashes, bloom.count = header["size"], header["num_hashes"], header["count"]
+            bloom.bits = bits
+            return bloom, header
+        except Exception:
+            logging.exception("Failed to load %s; refetching.", path)
+            return None, {}
+
+
+def coingecko_presence_filter() -> Optional[BloomFilter]:
+    """Bloom filter of lowercased CoinGecko coin names, re-downloaded only when the list changed."""
     if not COINGECKO_NEW_COIN_CHECK:
-        return []
+        return None
     url = "https://api.coingecko.com/api/v3/coins/list?include_platform=false"
+    cached, meta = BloomFilter.load(CG_BLOOM_PATH)
+    headers = {"User-Agent": USER_AGENT}
+    if cached is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
     try:
-        r = requests.get(url, timeout=30, headers={"User-Agent": USER_AGENT})
+        r = SESSION.get(url, timeout=30, headers=headers)
+        if r.status_code == 304 and cached is not None:
+            logging.info("CoinGecko list unchanged (304); using cached filter.")
+            return cached
         r.raise_for_status()
         # This returns ALL coins; in practice you’d want /coins/markets with order=new or use CoinMarketCap new listings.
         # We keep it simple and compare against a cached snapshot.
-        return r.json()
+        coins = orjson.loads(r.content)  # multi-MB payload; much faster than r.json()
+        bloom = BloomFilter(capacity=len(coins))
+        for c in coins:
+            nm = c.get("name") or ""
+            if nm:
+                bloom.add(nm.lower())
     except Exception:
         logging.exception("CoinGecko fetch failed")
-        return []
+        return cached  # a stale filter beats no presence signal
+
+    try:
+        bloom.save(CG_BLOOM_PATH, {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified")})
+    except Exception:
+        logging.exception("Failed to write %s", CG_BLOOM_PATH)
+    return bloom
+
+
+# Latest CoinGecko filter; refreshed off the poll loop by cg_refresher()
+CG_BLOOM: Optional[BloomFilter] = None
+
+
+def update_cg_bloom() -> None:
+    global CG_BLOOM
+    bloom = coingecko_presence_filter()
+    if bloom is not None:
+        CG_BLOOM = bloom
+        logging.info("CoinGecko list size: %d", bloom.count)
+
+
+async def cg_refresher() -> None:
+    """Background task: refresh CG_BLOOM every CG_REFRESH_SECONDS (initial load is done by the caller)."""
+    while True:
+        await asyncio.sleep(CG_REFRESH_SECONDS)
+        try:
+            await asyncio.to_thread(update_cg_bloom)
+        except Exception:
+            # keep the task alive; the next cycle retries
+            logging.exception("CoinGecko refresh failed")
 
 # -------------------------
 # Scoring & alerting
@@ -513,34 +950,43 @@ def start_of_month() -> datetime:
     return n.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
 
-def state_get_list(state: dict, key: str) -> list:
-    lst = state.get(key)
-    if not isinstance(lst, list):
-        lst = []
-        state[key] = lst
-    return lst
-
-def queue_signal(state: dict, sig: dict) -> None:
-    """De-dupe by name (lower) within the current digest window."""
-    pending = state_get_list(state, "pending_signals")
-    key = sig.get("name","").lower().strip()
-    # if already exists, merge sources/tags and max score
-    for s in pending:
-        if s.get("name","").lower().strip() == key:
-            # merge tags, keep first non-empty url, max score
-            s["tags"] = sorted(set(s.get("tags",[]) + sig.get("tags",[])))
-            if not s.get("url") and sig.get("url"):
-                s["url"] = sig["url"]
-            s["score"] = max(s.get("score",0), sig.get("score",0))
-            return
-    sig["ts"] = now_local().isoformat(timespec="seconds")
-    pending.append(sig)
-
-def should_send_digest(state: dict) -> bool:
-    pending = state_get_list(state, "pending_signals")
-    if not pending:
+_QUEUE_SIGNAL_SQL = """
+INSERT INTO pending (name_lc, name, url, tags, score, ts) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(name_lc) DO UPDATE SET
+    tags  = (SELECT json_group_array(value) FROM (
+                SELECT value FROM json_each(pending.tags)
+                UNION SELECT value FROM json_each(excluded.tags)
+                ORDER BY value)),
+    url   = COALESCE(NULLIF(pending.url, ''), excluded.url),
+    score = MAX(pending.score, excluded.score)
+"""
+
+
+def queue_signal(db: sqlite3.Connection, sig: dict) -> None:
+    """De-dupe by name (lower) within the current digest window: merge tags, keep first url, max score."""
+    db.execute(_QUEUE_SIGNAL_SQL, (
+        sig.get("name", "").lower().strip(),
+        sig.get("name", ""),
+        sig.get("url"),
+        orjson.dumps(sorted(set(sig.get("tags", [])))).decode(),
+        int(sig.get("score", 0)),
+        sig.get("ts") or now_local().isoformat(timespec="seconds"),
+    ))
+
+
+def load_pending(db: sqlite3.Connection) -> List[dict]:
+    out = []
+    for row in db.execute("SELECT name, url, tags, score, ts FROM pending ORDER BY rowid"):
+        sig = dict(row)
+        sig["tags"] = orjson.loads(sig["tags"])
+        out.append(sig)
+    return out
+
+
+def should_send_digest(db: sqlite3.Connection) -> bool:
+    if not db.execute("SELECT 1 FROM pending LIMIT 1").fetchone():
         return False
-    last = state.get("last_digest_sent")
+    last = get_meta(db, "last_digest_sent")
     if not last:
         return True
     try:
@@ -625,8 +1071,7 @@ def _format_dt_local(iso: str) -> str:
         pass
     return dt.strftime("%Y-%m-%d %H:%M")
 
-def _collect_rows(state: dict, start: datetime) -> List[List[str]]:
-    overlaps: dict = state.get("overlaps", {})
+def _collect_rows(overlaps: Dict[str, dict], start: datetime) -> List[List[str]]:
     rows: List[List[str]] = []
     for k, ov in overlaps.items():
         fs = _iso_to_dt(ov.get("first_seen", ""))
@@ -647,11 +1092,11 @@ def _collect_rows(state: dict, start: datetime) -> List[List[str]]:
     rows.sort(key=lambda r: r[1], reverse=True)  # first_seen desc (string is local formatted)
     return rows
 
-def render_report_md(state: dict) -> str:
+def render_report_md(overlaps: Dict[str, dict]) -> str:
     ts = now_local().strftime("%Y-%m-%d %H:%M")
-    today_rows = _collect_rows(state, start_of_today())
-    week_rows  = _collect_rows(state, start_of_week())
-    month_rows = _collect_rows(state, start_of_month())
+    today_rows = _collect_rows(overlaps, start_of_today())
+    week_rows  = _collect_rows(overlaps, start_of_week())
+    month_rows = _collect_rows(overlaps, start_of_month())
 
     lines = []
     lines.append(f"# VC Signals — Multi-VC Overlaps Report\n")
@@ -699,10 +1144,10 @@ def maybe_write_daily_snapshot(content: str) -> Optional[str]:
         logging.exception("Daily snapshot write failed")
     return None
 
-def send_digest_if_due(state: dict) -> None:
-    if not should_send_digest(state):
+def send_digest_if_due(db: sqlite3.Connection) -> None:
+    if not should_send_digest(db):
         return
-    pending = state_get_list(state, "pending_signals")
+    pending = load_pending(db)
     html_body = render_digest_html(pending)
     # fallback plaintext if needed
     plain = "VC Signals — Recap\n\n" + "\n".join(
@@ -711,8 +1156,8 @@ def send_digest_if_due(state: dict) -> None:
     # use email HTML send
     ok = send_email_html(DIGEST_SUBJECT, html_body, plain)
     if ok:
-        state["last_digest_sent"] = now_local().isoformat(timespec="seconds")
-        state["pending_signals"] = []
+        set_meta(db, "last_digest_sent", now_local().isoformat(timespec="seconds"))
+        db.execute("DELETE FROM pending")
         logging.info("Digest sent with %d items.", len(pending))
     else:
         logging.warning("Digest send failed; keeping items queued.")
@@ -729,11 +1174,7 @@ def send_email_html(subject: str, html_body: str, plain_fallback: str = "") -> b
         if plain_fallback:
             msg.attach(MIMEText(plain_fallback, "plain", "utf-8"))
         msg.attach(MIMEText(html_body, "html", "utf-8"))
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=20) as server:
-            server.starttls()
-            if SMTP_USER and SMTP_PASS:
-                server.login(SMTP_USER, SMTP_PASS)
-            server.sendmail(SMTP_FROM, [EMAIL_TO], msg.as_string())
+        _smtp_send(msg)
         return True
     except Exception:
         logging.exception("Email (HTML) send failed")
@@ -744,29 +1185,74 @@ def send_email_html(subject: str, html_body: str, plain_fallback: str = "") -> b
 # Main loop
 # -------------------------
 
-def main() -> None:
-    state = load_state()
-    seen = state.setdefault("seen_items", {})
-
-    # 1) Pull VC portfolios
+async def main() -> None:
+    # 1) Pull VC portfolios (all sources concurrently over one pooled session)
     vc_hits: Dict[str, Dict[str, Dict[str, str]]] = {}
+    results: Dict[str, List[Tuple[str, str]]] = {}
+    http_cache = load_http_cache()
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=16)) as sess:
+
+        async def fetch_bounded(src: Source) -> Tuple[Source, List[Tuple[str, str]]]:
+            # timeout starts once a slot is free, so queued sources aren't penalised
+            async with sem:
+                try:
+                    return src, await asyncio.wait_for(fetch_source_list(sess, src, http_cache), FETCH_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logging.warning("Fetch timed out after %ds (%s)", FETCH_TIMEOUT, src.name)
+                    return src, []
+
+        # sliding window: at most FETCH_CHUNK_SIZE tasks exist at once (keeps the task set small
+        # as VC_SOURCES grows), and a new one starts as soon as any finishes, so one slow site
+        # never holds up the rest
+        queue = iter(VC_SOURCES)
+        in_flight: Set[asyncio.Task] = set()
+
+        def top_up() -> None:
+            while len(in_flight) < FETCH_CHUNK_SIZE:
+                src = next(queue, None)
+                if src is None:
+                    return
+                in_flight.add(asyncio.create_task(fetch_bounded(src)))
+
+        top_up()
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            in_flight.difference_update(done)
+            for task in done:
+                src, projects = task.result()
+                logging.info("Fetched %d items from %s", len(projects), src.name)
+                results[src.key] = projects
+            top_up()
+    save_http_cache(http_cache)
+
+    # merge in VC_SOURCES order so display names / first links stay deterministic
     for src in VC_SOURCES:
-        projects = fetch_source_list(src)
-        logging.info("Fetched %d items from %s", len(projects), src.name)
+        projects = results.get(src.key, [])
         for disp_name, link in projects:
             proj_domain = domain_of(link) if link else ""
             key = normalize_project_name(disp_name)
-            if proj_domain and not re.search(
-                r"(a16z|binance|paradigm|pantera|polychain|dragonfly|jumpcrypto|wintermute|animoca|okx|hashed|electriccapital|framework)",
-                proj_domain, re.I
-            ):
+            if proj_domain and not _VC_DOMAIN.search(proj_domain):
                 key = proj_domain.lower()
             entry = vc_hits.setdefault(key, {"display": disp_name, "sources": {}})
             entry["display"] = disp_name
             entry["sources"][src.name] = link
 
+    db = open_state()
+    try:
+        _record_signals(db, vc_hits)
+        send_digest_if_due(db)
+        db.commit()
+        report_md = render_report_md(load_overlaps(db))
+        write_text_if_changed(REPORT_PATH, report_md)
+    finally:
+        db.close()
+
+
+def _record_signals(db: sqlite3.Connection, vc_hits: Dict[str, Dict[str, Dict[str, str]]]) -> None:
+    """Update overlaps, score and queue new signals inside the caller's transaction."""
     # --- BOOTSTRAP existing overlaps on first run ---
-    overlaps = state.setdefault("overlaps", {})
+    overlaps = load_overlaps(db)
     ts_now = now_local().isoformat(timespec="seconds")
     for key, entry in vc_hits.items():
         tags = list(entry["sources"].keys())
@@ -780,18 +1266,12 @@ def main() -> None:
                 "first_seen": ts_now,
                 "last_seen": ts_now,
             }
+            save_overlap(db, key, overlaps[key])
 
-    # 2) CoinGecko presence check
-    cg_names: Set[str] = set()
-    if COINGECKO_NEW_COIN_CHECK:
-        coins = coingecko_new_coins()
-        for c in coins:
-            nm = c.get("name") or ""
-            if nm:
-                cg_names.add(nm.lower())
-        logging.info("CoinGecko list size: %d", len(cg_names))
+    # 2) CoinGecko presence check (filter is kept fresh by cg_refresher / run_once)
+    cg_bloom = CG_BLOOM
 
-    # 3) Compute NEW signals
+    # 3) Compute NEW signals (re-alert a name only when its score goes up)
     for key, entry in vc_hits.items():
         tags = list(entry["sources"].keys())
         if REQUIRE_MULTI_VC and len(tags) < 2:
@@ -799,13 +1279,11 @@ def main() -> None:
 
         disp = entry["display"]
         link = next(iter(entry["sources"].values())) if entry["sources"] else None
-        score = score_project(disp, link, tags, disp.lower() in cg_names)
+        score = score_project(disp, link, tags, cg_bloom is not None and disp.lower() in cg_bloom)
 
         if score >= SCORE_THRESHOLD:
-            bucket = f"{key}:{score}"
-            seen_src = seen.setdefault("vc_signals", [])
-            if bucket not in seen_src:
-                seen_src.append(bucket)
+            if score > seen_score(db, "vc_signals", key):
+                mark_seen(db, "vc_signals", key, score)
 
                 ov = overlaps.setdefault(key, {})
                 ov["name"] = disp
@@ -813,34 +1291,48 @@ def main() -> None:
                 ov["vcs"] = sorted(set(ov.get("vcs", [])).union(tags))
                 ov["score"] = max(int(ov.get("score", 0)), score)
                 ov["last_seen"] = ts_now
+                save_overlap(db, key, ov)
 
-                queue_signal(state, {"name": disp, "url": link, "tags": tags, "score": score})
+                queue_signal(db, {"name": disp, "url": link, "tags": tags, "score": score})
 
-    send_digest_if_due(state)
-    report_md = render_report_md(state)
-    write_text_if_changed(REPORT_PATH, report_md)
-    save_state(state)
+    prune_seen(db, "vc_signals")
 
 
+async def run_once() -> None:
+    await asyncio.to_thread(update_cg_bloom)
+    await main()
+
+
+async def run_forever() -> None:
+    await asyncio.to_thread(update_cg_bloom)
+    refresher = asyncio.create_task(cg_refresher()) if COINGECKO_NEW_COIN_CHECK else None
+    try:
+        while True:
+            await main()
+            await asyncio.sleep(POLL_INTERVAL)
+    finally:
+        if refresher is not None:
+            refresher.cancel()
+
 
 if __name__ == "__main__":
     if "telegram" in PREFERRED_DEST and (not BOT_TOKEN or not CHAT_ID):
         logging.warning("Telegram is not configured (BOT_TOKEN/CHAT_ID missing). Running in dry-run mode.")
 
     if ONE_SHOT:
-        main()
+        asyncio.run(run_once())
     else:
         try:
-            while True:
-                main()
-                time.sleep(POLL_INTERVAL)
+            asyncio.run(run_forever())
         except KeyboardInterrupt:
             print("Exiting...")
 
 
 # requirements.txt (reference)
 # requests
-# beautifulsoup4
+# aiohttp
+# orjson
+# selectolax>=0.3.12  # lexbor backend (selectolax.parser/Modest is gone in 1.0)
 # python-dotenv
 # twilio  # only if you want SMS
 